@@ -16,8 +16,17 @@
 # 1.0          Vincent von Appen   25.02.2024  Initial version
 # ==================================================================
 
+import matplotlib
+
+# Running as a script only saves figures, so skip loading an interactive backend
+BATCH_MODE = __name__ == "__main__"
+if BATCH_MODE:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import EllipseCollection
+from matplotlib.figure import Figure
 from matplotlib.path import Path
 import numpy as np
 
@@ -26,6 +35,42 @@ Radius = 1
 X_DIS = 2.1
 Y_DIS = 2.1
 
+# Lookup table index -> (row, column), stored at index - 1
+_INDEX_MAP = ((1, 1), (2, 1), (2, 2), (3, 1), (3, 2), (3, 3), (4, 1), (4, 2), (4, 3), (4, 4))
+
+
+def compute_xy(rows, cols):
+    """
+    Compute the x and y coordinates of many positions at once.
+
+    Half steps are allowed, positions are not validated.
+
+    Parameters:
+    - rows: The rows of the positions.
+    - cols: The columns of the positions.
+
+    Returns:
+    - An array of shape (N, 2) with the x and y coordinates.
+    """
+    rows = np.asarray(rows, dtype=float).ravel()
+    cols = np.asarray(cols, dtype=float).ravel()
+    xy = np.empty((rows.size, 2))
+    xy[:, 0] = (cols - 1) * X_DIS - (rows - 1) * X_DIS / 2
+    xy[:, 1] = (1 - rows) * Y_DIS
+    return xy
+
+
+# Lookup table index -> (x, y), computed once at import (row 0 is unused)
+_INDEX_TO_XY = np.vstack([(np.nan, np.nan), compute_xy(*zip(*_INDEX_MAP))])
+
+# Static plot layout shared by all configurations
+_X_LIM = (-6, 6)
+_Y_LIM = (-8, Y_DIS*1.5)
+_TRIANGLE_POINTS = np.array([(-2.3*X_DIS, -3.5*Y_DIS), (0, Y_DIS*1.1), (2.3*X_DIS, -3.5*Y_DIS)])
+
+# Fast PNG encoding for saved configurations (larger files, much less compression time)
+_SAVE_KWARGS = {'dpi': 100, 'pil_kwargs': {'optimize': False, 'compress_level': 1}}
+
 
 class Position:
     """
@@ -69,14 +114,17 @@ class Position:
         """
         self.index = index
         self.position = position
+
+        # Index only: the position is resolved from the index, no validation needed
+        if position == (0, 0):
+            self._init_xy_index()
+        else:
+            self._check_position()
+            self._init_xy_position()
+
         #create hash for id
         self.id = hash(self.position)
         
-        if position != (0, 0) and self._check_position():
-            self._init_xy_position()
-        else:
-            self._init_xy_index()
-        
     
     def _check_position(self):
         """
@@ -98,7 +146,7 @@ class Position:
 
         # Check if using full numbers without half steps
         if all(isinstance(i, int) for i in self.position):
-            expected_index = sum(range(self.position[0])) + self.position[1]
+            expected_index = self.position[0] * (self.position[0] - 1) // 2 + self.position[1]
             if self.index != expected_index:
                 raise ValueError(f"Index does not match the expected value for the position {self.position}. Expected index: {expected_index}, given index: {self.index}.")
 
@@ -133,20 +181,12 @@ class Position:
         Position is a single number from 1 to 10.
         This needs to be converted to the x and y coordinates of the position.
         """
-        mapping = {
-            1: (1, 1),
-            2: (2, 1),
-            3: (2, 2),
-            4: (3, 1),
-            5: (3, 2),
-            6: (3, 3),
-            7: (4, 1),
-            8: (4, 2),
-            9: (4, 3),
-            10: (4, 4)
-        }
-        self.position = mapping[self.index]
-        self._init_xy_position()
+        # Integral values like 1.0 are accepted, as with a dict lookup
+        if self.index not in range(1, 11):
+            raise ValueError(f"Index must be an integer between 1 and 10, given index: {self.index!r}.")
+        index = int(self.index)
+        self.position = _INDEX_MAP[index - 1]
+        self.x, self.y = _INDEX_TO_XY[index].tolist()
 
 
 class BeerPongCup(Position):
@@ -176,7 +216,9 @@ class BeerPongCup(Position):
 
     def plot(self, ax):
         """
-        Plot the beer pong cup.
+        Plot the beer pong cup as a single artist.
+
+        BeerPongConfig draws all cups in one collection, this is kept for plotting single cups.
 
         Parameters:
         - ax: The axis to plot the cup on.
@@ -231,7 +273,6 @@ class BeerPongConfig:
         elif len(self.cups) > 10:
             print("Warning: More than 10 cups were created.")
 
-
     def _init_indices(self, indices):
         """
         Initialize the indices on the table.
@@ -298,34 +339,47 @@ class BeerPongConfig:
             cups.append(BeerPongCup(i))
         return cups
 
-    def _plot(self):
+    def _draw(self, ax):
         """
-        Plot the beer pong table.
-        """
-        fig, ax = plt.subplots()
-        ax.set_aspect('equal')
+        Draw the cups and the title of the beer pong table on a configured axis.
 
-        # Set axis limits
-        ax.set_xlim(-6, 6)
-        ax.set_ylim(-8, Y_DIS*1.5)
-
-        # disable numbers on axis
-        ax.set_xticks([])
-        ax.set_yticks([])
+        Parameters:
+        - ax: The axis to draw the table on.
 
-        # Plot cups
-        for cup in self.cups:
-            cup.plot(ax)
+        Returns:
+        - A list of the added artists.
+        """
+        artists = []
+
+        # Plot all cups at once as a single collection
+        if self.cups:
+            n = len(self.cups)
+            xy = np.empty((n, 2))
+            diameters = np.empty(n)
+            colors = []
+            linestyles = []
+            for i, cup in enumerate(self.cups):
+                xy[i] = cup.x, cup.y
+                diameters[i] = 2 * cup.radius
+                colors.append("grey" if cup.phantom else cup.color)
+                linestyles.append(":" if cup.phantom else "-")
+            circles = EllipseCollection(widths=diameters, heights=diameters, angles=0, units='xy',
+                                        offsets=xy, offset_transform=ax.transData,
+                                        edgecolors=colors, facecolors='none', linestyles=linestyles)
+            artists.append(ax.add_collection(circles, autolim=False))
 
-        # Triangle points
-        triangle_points = [(-2.3*X_DIS, -3.5*Y_DIS), (0, Y_DIS*1.1), (2.3*X_DIS, -3.5*Y_DIS)]
+        # Add title
+        ax.set_title(self.title)
 
-        # Plot triangle
-        triangle = plt.Polygon(triangle_points, closed=True, edgecolor='grey', fill=False, linestyle=':')
-        ax.add_patch(triangle)
+        return artists
 
-        # Add title
-        plt.title(self.title)
+    def _plot(self):
+        """
+        Plot the beer pong table on a new figure.
+        """
+        fig, ax = plt.subplots()
+        _configure_axes(ax)
+        self._draw(ax)
 
         return fig, ax
 
@@ -340,11 +394,61 @@ class BeerPongConfig:
         """
         Save the beer pong table to a file.
 
+        The figure is shared between all saves, only the cups are replaced.
+
         Parameters:
-        - filename: The filename to save the table to.
+        - directory: The directory to save the table to.
         """
-        fig, ax = self._plot()
-        plt.savefig(directory+self.title + ".png")
+        fig, ax = _get_save_figure()
+        artists = self._draw(ax)
+        try:
+            fig.savefig(directory + self.title + ".png", **_SAVE_KWARGS)
+        finally:
+            for artist in artists:
+                artist.remove()
+
+
+def _configure_axes(ax):
+    """
+    Configure the static parts of an axis: limits, ticks and the triangle.
+
+    Parameters:
+    - ax: The axis to configure.
+    """
+    ax.set_aspect('equal')
+
+    # Set axis limits
+    ax.set_xlim(*_X_LIM)
+    ax.set_ylim(*_Y_LIM)
+
+    # disable numbers on axis
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    # Plot triangle
+    triangle = plt.Polygon(_TRIANGLE_POINTS, closed=True, edgecolor='grey', fill=False, linestyle=':')
+    ax.add_patch(triangle)
+
+
+_SAVE_FIGURE = None
+
+
+def _get_save_figure():
+    """
+    Get the figure and axis used for saving, creating and configuring them on first use.
+
+    The figure is not registered with pyplot, so it is never shown and never needs closing.
+
+    Returns:
+    - The figure and the axis.
+    """
+    global _SAVE_FIGURE
+    if _SAVE_FIGURE is None:
+        fig = Figure()
+        ax = fig.subplots()
+        _configure_axes(ax)
+        _SAVE_FIGURE = (fig, ax)
+    return _SAVE_FIGURE
 
 
 if __name__ == "__main__":